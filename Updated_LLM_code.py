@@ -6,6 +6,7 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from calendar_api_executor import insert_event, new_request_id
 from langchain_groq import ChatGroq
  
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
@@ -13,7 +14,10 @@ SCOPES = ["https://www.googleapis.com/auth/calendar"]
 def get_current_date():
     return datetime.now().date()
  
-def extract_meeting_info(user_input):
+def get_llm():
+    return ChatGroq(model="llama-3.1-70b-versatile", temperature=0.2, groq_api_key=os.environ["GROQ_API_KEY"])
+ 
+def extract_meeting_info(user_input, llm=None):
     """Extracts meeting information from user input using LLM."""
     llm_prompt = f"""
     Extract the following meeting details from the input: '{user_input}'.
@@ -49,7 +53,7 @@ def extract_meeting_info(user_input):
     If the user does not provide any end_time then set the meeting for 1 hour.
     """
  
-    llm = ChatGroq(model="llama-3.1-70b-versatile", temperature=0.2, groq_api_key='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')
+    llm = llm or get_llm()
     llm_response = llm.invoke(llm_prompt)
  
     llm_output = llm_response.content.strip()
@@ -65,6 +69,54 @@ def extract_meeting_info(user_input):
  
     return llm_data
  
+def build_event(meeting_details):
+    """Builds a Calendar event body from the extracted meeting details."""
+    # Set default values if keys are missing
+    meeting_details.setdefault('summary', 'Meeting Summary')
+    meeting_details.setdefault('location', 'Any Location')
+    meeting_details.setdefault('description', 'Meeting Description')
+    meeting_details.setdefault('start_date', get_current_date().strftime('%Y-%m-%d'))
+    meeting_details.setdefault('end_date', meeting_details['start_date'])
+    meeting_details.setdefault('time_zone', 'Asia/Kolkata')
+    meeting_details.setdefault('recurrence', 'RRULE:FREQ=DAILY;COUNT=1')
+    meeting_details.setdefault('conference_data', 'yes')
+ 
+    # Parse dates and times
+    start_datetime = f"{meeting_details['start_date']}T{meeting_details['start_time']}:00"
+    end_datetime = f"{meeting_details['end_date']}T{meeting_details['end_time']}:00"
+ 
+    # Parse attendees
+    attendees = [{"email": email.strip()} for email in meeting_details['attendees'].split(",")]
+ 
+    event = {
+        "summary": meeting_details["summary"],
+        "location": meeting_details["location"],
+        "description": meeting_details["description"],
+        "colorId": 6,
+        "start": {
+            "dateTime": start_datetime,
+            "timeZone": meeting_details["time_zone"]
+        },
+        "end": {
+            "dateTime": end_datetime,
+            "timeZone": meeting_details["time_zone"]
+        },
+        "recurrence": [
+            meeting_details["recurrence"]
+        ],
+        "attendees": attendees,
+        "conferenceData": {
+            "createRequest": {
+                "requestId": new_request_id(),
+                "conferenceSolutionKey": {
+                    "type": "hangoutsMeet"
+                }
+            }
+        }
+    }
+ 
+    return event
+ 
 def main():
     creds = None
  
@@ -87,51 +139,9 @@ def main():
         user_input = input("Enter your meeting request: ")
         meeting_details = extract_meeting_info(user_input)
  
-        # Set default values if keys are missing
-        meeting_details.setdefault('summary', 'Meeting Summary')
-        meeting_details.setdefault('location', 'Any Location')
-        meeting_details.setdefault('description', 'Meeting Description')
-        meeting_details.setdefault('start_date', get_current_date().strftime('%Y-%m-%d'))
-        meeting_details.setdefault('end_date', meeting_details['start_date'])
-        meeting_details.setdefault('time_zone', 'Asia/Kolkata')
-        meeting_details.setdefault('recurrence', 'RRULE:FREQ=DAILY;COUNT=1')
-        meeting_details.setdefault('conference_data', 'yes')
- 
-        # Parse dates and times
-        start_datetime = f"{meeting_details['start_date']}T{meeting_details['start_time']}:00"
-        end_datetime = f"{meeting_details['end_date']}T{meeting_details['end_time']}:00"
- 
-        # Parse attendees
-        attendees = [{"email": email.strip()} for email in meeting_details['attendees'].split(",")]
- 
-        event = {
-            "summary": meeting_details["summary"],
-            "location": meeting_details["location"],
-            "description": meeting_details["description"],
-            "colorId": 6,
-            "start": {
-                "dateTime": start_datetime,
-                "timeZone": meeting_details["time_zone"]
-            },
-            "end": {
-                "dateTime": end_datetime,
-                "timeZone": meeting_details["time_zone"]
-            },
-            "recurrence": [
-                meeting_details["recurrence"]
-            ],
-            "attendees": attendees,
-            "conferenceData": {
-                "createRequest": {
-                    "requestId": "sample123",
-                    "conferenceSolutionKey": {
-                        "type": "hangoutsMeet"
-                    }
-                }
-            }
-        }
+        event = build_event(meeting_details)
  
-        event = service.events().insert(calendarId="primary", body=event, conferenceDataVersion=1).execute()
+        event = insert_event(service, "primary", event, conferenceDataVersion=1)
  
         print(f"Event created: {event.get('htmlLink')}")
     except HttpError as error:
@@ -0,0 +1,185 @@
+import json
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+import httplib2
+from googleapiclient.errors import HttpError
+
+# Errors the Calendar API returns when we send requests too fast. A 403
+# quotaExceeded (usage or daily limit) is deliberately absent: waiting a few
+# seconds cannot fix it, so it is raised instead of retried.
+QUOTA_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Network failures where the request may or may not have reached the server.
+TRANSPORT_ERRORS = (OSError, httplib2.HttpLib2Error)
+
+
+def get_error_reason(error):
+    """Returns the first 'reason' from the error body of an HttpError, if any."""
+    try:
+        content = error.content.decode("utf-8") if isinstance(error.content, bytes) else error.content
+        errors = json.loads(content)["error"]["errors"]
+        return errors[0].get("reason")
+    except (AttributeError, KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+def is_quota_error(error):
+    status = error.resp.status
+    return status == 429 or (status == 403 and get_error_reason(error) in QUOTA_REASONS)
+
+
+def is_retryable_error(error):
+    return is_quota_error(error) or error.resp.status in RETRYABLE_STATUSES
+
+
+class AdaptiveRateLimiter:
+    """Paces Calendar API calls, adapting the rate to quota errors (AIMD).
+
+    The overall rate grows additively after every success and is cut
+    multiplicatively on every quota error. Send slots are spaced 1/rate apart
+    and each one is handed out only when it comes up, taking turns among the
+    calendars waiting at that moment. A busy calendar cannot starve one that
+    arrives later, and no slot goes unused while anyone is waiting.
+    """
+
+    def __init__(self, initial_rate=5.0, min_rate=0.5, max_rate=50.0,
+                 increase=0.5, decrease=0.5,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        # Waiting callers per calendar, in the order calendars get their next turn.
+        self._waiting = OrderedDict()
+
+    def _dispatch(self, now):
+        # Hand the current slot, if it has come up, to the calendar whose turn it is.
+        if not self._waiting or now < self._next_slot:
+            return
+        calendar_id, tickets = next(iter(self._waiting.items()))
+        tickets.popleft().set()
+        if tickets:
+            self._waiting.move_to_end(calendar_id)
+        else:
+            del self._waiting[calendar_id]
+        self._next_slot = max(self._next_slot, now) + 1.0 / self.rate
+
+    def acquire(self, calendar_id="primary"):
+        """Blocks until a request for calendar_id may be sent."""
+        ticket = threading.Event()
+        with self._lock:
+            self._waiting.setdefault(calendar_id, deque()).append(ticket)
+
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._dispatch(now)
+                if ticket.is_set():
+                    return
+                delay = self._next_slot - now
+            self.sleep(delay)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_quota_error(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+
+
+default_limiter = AdaptiveRateLimiter()
+
+
+def execute_request(request, calendar_id="primary", limiter=None, max_retries=6,
+                    base_delay=1.0, max_delay=64.0, sleep=time.sleep):
+    """Executes a Calendar API request with rate limiting and retries.
+
+    Quota errors (403 rateLimitExceeded, 429), transient server errors and
+    network errors (timeouts, dropped connections) are retried with
+    exponential backoff and full jitter. Any other HttpError, or the last
+    error once max_retries is used up, is raised to the caller.
+    """
+    limiter = limiter or default_limiter
+    attempt = 0
+    while True:
+        limiter.acquire(calendar_id)
+        try:
+            response = request.execute()
+        except HttpError as error:
+            if is_quota_error(error):
+                limiter.on_quota_error()
+            if not is_retryable_error(error) or attempt >= max_retries:
+                raise
+        except TRANSPORT_ERRORS:
+            if attempt >= max_retries:
+                raise
+        else:
+            limiter.on_success()
+            return response
+        sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+        attempt += 1
+
+
+def new_request_id():
+    """Returns a unique ID usable both as an event ID and a conference requestId."""
+    # Hex digits are a subset of the base32hex alphabet the API requires for event IDs.
+    return uuid.uuid4().hex
+
+
+def list_events(service, calendar_id, limiter=None, **kwargs):
+    request = service.events().list(calendarId=calendar_id, **kwargs)
+    return execute_request(request, calendar_id=calendar_id, limiter=limiter)
+
+
+def query_freebusy(service, calendar_ids, time_min, time_max, limiter=None, **kwargs):
+    body = dict(kwargs, timeMin=time_min, timeMax=time_max,
+                items=[{"id": calendar_id} for calendar_id in calendar_ids])
+    request = service.freebusy().query(body=body)
+    return execute_request(request, calendar_id=calendar_ids[0] if calendar_ids else "primary", limiter=limiter)
+
+
+class _AttemptRecorder:
+    """Wraps a request and remembers which error each failed attempt raised."""
+
+    def __init__(self, request):
+        self.request = request
+        self.errors = []
+
+    def execute(self):
+        try:
+            return self.request.execute()
+        except Exception as error:
+            self.errors.append(error)
+            raise
+
+
+def insert_event(service, calendar_id, event, limiter=None, **kwargs):
+    """Inserts an event so that retries cannot create duplicates.
+
+    Unless the caller supplies one, the event is given a client-side ID
+    before the first attempt. If an earlier attempt reached the server but
+    its response was lost (a timeout or dropped connection), the retry fails
+    with 409 and the already created event is fetched instead. Any other 409
+    means the ID belongs to a different event and is raised to the caller.
+    """
+    event = dict(event)
+    generated_id = "id" not in event
+    event.setdefault("id", new_request_id())
+    request = _AttemptRecorder(service.events().insert(calendarId=calendar_id, body=event, **kwargs))
+    try:
+        return execute_request(request, calendar_id=calendar_id, limiter=limiter)
+    except HttpError as error:
+        # Only a retry of our own insert can collide with the event it created.
+        if error.resp.status != 409 or not generated_id or len(request.errors) < 2:
+            raise
+        request = service.events().get(calendarId=calendar_id, eventId=event["id"])
+        return execute_request(request, calendar_id=calendar_id, limiter=limiter)
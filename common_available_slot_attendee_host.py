@@ -7,6 +7,7 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from calendar_api_executor import list_events
  
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
  
@@ -32,13 +33,14 @@ def get_credentials(email):
 def get_events(service, calendar_id, date):
     start_of_day = dt.datetime.combine(date, dt.time.min).astimezone(pytz.utc).isoformat()
     end_of_day = dt.datetime.combine(date, dt.time.max).astimezone(pytz.utc).isoformat()
-    event_result = service.events().list(
-        calendarId=calendar_id,
+    event_result = list_events(
+        service,
+        calendar_id,
         timeMin=start_of_day,
         timeMax=end_of_day,
         singleEvents=True,
         orderBy="startTime"
-    ).execute()
+    )
     events = event_result.get("items", [])
     return events
  
@@ -5,6 +5,7 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from calendar_api_executor import list_events
  
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
  
@@ -38,13 +39,14 @@ def main():
         now = dt.datetime.utcnow().isoformat() + "Z"
  
         # Get the upcoming events
-        event_result = service.events().list(
-            calendarId=colleague_calendar_id,
+        event_result = list_events(
+            service,
+            colleague_calendar_id,
             timeMin=now,
             maxResults=10,
             singleEvents=True,
             orderBy="startTime"
-        ).execute()
+        )
         events = event_result.get("items", [])
  
         # If no events are found, print a message
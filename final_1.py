@@ -5,6 +5,7 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from calendar_api_executor import insert_event, new_request_id
 from langchain_groq import ChatGroq
  
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
@@ -118,7 +119,7 @@ def main():
             "attendees": attendees,
             "conferenceData": {
                 "createRequest": {
-                    "requestId": "sample123",
+                    "requestId": new_request_id(),
                     "conferenceSolutionKey": {
                         "type": "hangoutsMeet"
                     }
@@ -126,7 +127,7 @@ def main():
             }
         }
  
-        event = service.events().insert(calendarId="primary", body=event, conferenceDataVersion=1).execute()
+        event = insert_event(service, "primary", event, conferenceDataVersion=1)
  
         print(f"Event created: {event.get('htmlLink')}")
     except HttpError as error:
@@ -6,6 +6,7 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from calendar_api_executor import insert_event
 
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
 
@@ -68,7 +69,7 @@ def main():
         }
 
 
-        event = service.events().insert(calendarId = "primary", body = event).execute()
+        event = insert_event(service, "primary", event)
 
         print("Event created {event.get(htmlLink)}")
 
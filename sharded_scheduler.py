@@ -0,0 +1,294 @@
+import datetime as dt
+import json
+import multiprocessing as mp
+import os
+import queue
+import zlib
+from multiprocessing.managers import BaseManager
+import pytz
+from dateutil import parser
+from dateutil.rrule import rrulestr
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+from calendar_api_executor import AdaptiveRateLimiter, insert_event, query_freebusy
+from common_available_slot_attendee_host import SCOPES
+from Updated_LLM_code import build_event, extract_meeting_info, get_llm
+
+# Names the LLM tends to return that pytz does not know.
+TIME_ZONE_ALIASES = {"IST": "Asia/Kolkata"}
+# How far ahead recurring meetings are checked for conflicts. Longer series are refused.
+RECURRENCE_HORIZON = dt.timedelta(days=60)
+
+
+class LimiterManager(BaseManager):
+    """Serves one AdaptiveRateLimiter that all worker processes share."""
+
+
+LimiterManager.register("AdaptiveRateLimiter", AdaptiveRateLimiter, exposed=("acquire", "on_success", "on_quota_error"))
+
+
+def shard_for(host_email, num_shards):
+    """Maps a host email to a worker. Stable across processes and runs."""
+    return zlib.crc32(host_email.strip().lower().encode("utf-8")) % num_shards
+
+
+def normalize_time_zone(time_zone):
+    """Returns the IANA name for time_zone, or raises ValueError if it is unknown."""
+    time_zone = TIME_ZONE_ALIASES.get(time_zone.strip().upper(), time_zone.strip())
+    try:
+        pytz.timezone(time_zone)
+    except pytz.UnknownTimeZoneError:
+        raise ValueError(f"Unknown time zone: {time_zone}")
+    return time_zone
+
+
+def load_saved_credentials(email):
+    """Loads the saved token for email without ever prompting the user.
+
+    Workers run headless, so a missing or unusable token is an error for that
+    request; authorize the host once with common_available_slot_attendee_host.py.
+    """
+    token_file = f"token_{email}.json"
+    if not os.path.exists(token_file):
+        raise RuntimeError(f"No saved token for {email}; authorize it before scheduling")
+
+    creds = Credentials.from_authorized_user_file(token_file, SCOPES)
+    if not creds.valid:
+        if not (creds.expired and creds.refresh_token):
+            raise RuntimeError(f"Saved token for {email} is invalid; authorize it again")
+        creds.refresh(Request())
+        with open(token_file, "w") as token:
+            token.write(creds.to_json())
+
+    return creds
+
+
+def meeting_occurrences(meeting_details):
+    """Returns (start, end) for every occurrence of the meeting, in UTC.
+
+    Raises ValueError if the recurrence runs past RECURRENCE_HORIZON, since
+    those occurrences could not be checked for conflicts.
+    """
+    tz = pytz.timezone(meeting_details["time_zone"])
+    start = tz.localize(dt.datetime.strptime(f"{meeting_details['start_date']} {meeting_details['start_time']}", "%Y-%m-%d %H:%M"))
+    end = tz.localize(dt.datetime.strptime(f"{meeting_details['end_date']} {meeting_details['end_time']}", "%Y-%m-%d %H:%M"))
+    horizon = start + RECURRENCE_HORIZON
+
+    occurrences = []
+    for occurrence in rrulestr(meeting_details["recurrence"], dtstart=start):
+        if occurrence > horizon:
+            raise ValueError(f"Recurrence runs past {RECURRENCE_HORIZON.days} days; cannot check it for conflicts")
+        # Keep the wall-clock time of every occurrence across DST changes.
+        occurrence_start = tz.localize(occurrence.replace(tzinfo=None))
+        occurrences.append((occurrence_start.astimezone(pytz.utc), (occurrence_start + (end - start)).astimezone(pytz.utc)))
+
+    return occurrences
+
+
+def find_conflicts(occurrences, busy):
+    """Returns the busy intervals that overlap any occurrence."""
+    conflicts = []
+    for interval in busy:
+        busy_start = parser.isoparse(interval["start"])
+        busy_end = parser.isoparse(interval["end"])
+        if any(start < busy_end and busy_start < end for start, end in occurrences):
+            conflicts.append(interval)
+    return conflicts
+
+
+class WorkerContext:
+    """Clients a worker keeps warm for the hosts in its shard."""
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self._services = {}
+        self._llm = None
+
+    def service_for(self, email):
+        if email not in self._services:
+            self._services[email] = build("calendar", "v3", credentials=load_saved_credentials(email))
+        return self._services[email]
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            self._llm = get_llm()
+        return self._llm
+
+
+def schedule_meeting(context, request):
+    """Parses a meeting request and books it on the host's calendar if every occurrence is free.
+
+    Requests for one host always run in the same worker, one at a time, so
+    the free/busy check and the insert cannot interleave with another booking
+    for that host.
+    """
+    host_email = request["host_email"]
+    meeting_details = extract_meeting_info(request["user_input"], llm=context.llm)
+    meeting_details["time_zone"] = normalize_time_zone(meeting_details.get("time_zone", "Asia/Kolkata"))
+    event = build_event(meeting_details)
+    occurrences = meeting_occurrences(meeting_details)
+    service = context.service_for(host_email)
+
+    time_min = occurrences[0][0].isoformat()
+    time_max = occurrences[-1][1].isoformat()
+    # The host's email names its primary calendar, and keys it in the shared limiter.
+    busy = query_freebusy(service, [host_email], time_min, time_max, limiter=context.limiter)["calendars"][host_email]["busy"]
+    conflicts = find_conflicts(occurrences, busy)
+    if conflicts:
+        return {"status": "conflict", "host_email": host_email, "busy": conflicts}
+
+    event = insert_event(service, host_email, event, limiter=context.limiter, conferenceDataVersion=1)
+    return {"status": "created", "host_email": host_email, "htmlLink": event.get("htmlLink")}
+
+
+def _worker(task_queue, result_queue, handler, limiter, cancelled_batch):
+    context = WorkerContext(limiter)
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        batch_id, seq, request = task
+        # The caller stopped reading that map(); don't book meetings nobody will see.
+        if batch_id <= cancelled_batch.value:
+            continue
+        try:
+            result = handler(context, request)
+        # Report any failure as a result; an exception escaping here would kill the worker.
+        except Exception as error:
+            result = {"status": "error", "host_email": request.get("host_email"), "error": str(error)}
+        result_queue.put((batch_id, seq, result))
+
+
+class ShardedScheduler:
+    """Runs meeting requests on a pool of processes sharded by host email.
+
+    Each worker owns the hosts that hash to it, so per-host work is
+    serialized while different hosts proceed in parallel on separate cores.
+    All workers pace their Calendar calls through one AdaptiveRateLimiter
+    served by a manager process, so the pool as a whole stays within the
+    same quota as a single process. Use as a context manager, or call
+    close() when done.
+    """
+
+    def __init__(self, workers=None, handler=schedule_meeting, max_in_flight=None, poll_interval=1.0):
+        self.num_workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.num_workers * 4
+        self.poll_interval = poll_interval
+        self._manager = LimiterManager()
+        self._manager.start()
+        self.limiter = self._manager.AdaptiveRateLimiter()
+        self._result_queue = mp.Queue()
+        self._task_queues = []
+        self._processes = []
+        self._batch_id = 0
+        self._active_batch = None
+        self._cancelled_batch = mp.Value("i", 0)
+        for _ in range(self.num_workers):
+            task_queue = mp.Queue()
+            process = mp.Process(target=_worker, args=(task_queue, self._result_queue, handler, self.limiter, self._cancelled_batch), daemon=True)
+            process.start()
+            self._task_queues.append(task_queue)
+            self._processes.append(process)
+
+    def _check_workers(self):
+        for process in self._processes:
+            if not process.is_alive():
+                raise RuntimeError(f"Worker process {process.pid} exited with code {process.exitcode}")
+
+    def _next_result(self, batch_id):
+        while True:
+            try:
+                result_batch, seq, result = self._result_queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            # Results left over from an earlier map() that was abandoned early.
+            if result_batch == batch_id:
+                return seq, result
+
+    def map(self, requests):
+        """Yields one result per request, in the order the requests were given.
+
+        Results are streamed as soon as every earlier request has finished;
+        at most max_in_flight requests are queued on the workers at a time.
+        Only one map() may be consumed at a time; requests of a map() that is
+        abandoned early are skipped. Raises RuntimeError if a worker process
+        dies.
+        """
+        if self._active_batch is not None:
+            raise RuntimeError("Another map() on this scheduler is still running")
+        self._batch_id += 1
+        batch_id = self._active_batch = self._batch_id
+
+        finished = False
+        try:
+            pending = {}
+            next_to_yield = 0
+            submitted = 0
+
+            for request in requests:
+                shard = shard_for(request["host_email"], self.num_workers)
+                self._task_queues[shard].put((batch_id, submitted, request))
+                submitted += 1
+                # Only block on results once enough requests are queued.
+                if submitted - next_to_yield < self.max_in_flight:
+                    continue
+                seq, result = self._next_result(batch_id)
+                pending[seq] = result
+                while next_to_yield in pending:
+                    yield pending.pop(next_to_yield)
+                    next_to_yield += 1
+
+            while next_to_yield < submitted:
+                seq, result = self._next_result(batch_id)
+                pending[seq] = result
+                while next_to_yield in pending:
+                    yield pending.pop(next_to_yield)
+                    next_to_yield += 1
+            finished = True
+        finally:
+            if not finished:
+                self._cancelled_batch.value = batch_id
+            self._active_batch = None
+
+    def close(self, timeout=10.0):
+        for task_queue, process in zip(self._task_queues, self._processes):
+            if process.is_alive():
+                task_queue.put(None)
+            else:
+                # Nobody will read this queue again; don't wait on it at exit.
+                task_queue.cancel_join_thread()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._manager.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    # Each line of the file: {"host_email": "...", "user_input": "..."}
+    requests_file = input("Enter the path to the meeting requests file (JSON lines): ").strip()
+    with open(requests_file) as f:
+        requests = [json.loads(line) for line in f if line.strip()]
+
+    with ShardedScheduler() as scheduler:
+        for request, result in zip(requests, scheduler.map(requests)):
+            if result["status"] == "created":
+                print(f"Event created for {request['host_email']}: {result['htmlLink']}")
+            elif result["status"] == "conflict":
+                print(f"Skipped for {request['host_email']}: slot is already busy")
+            else:
+                print(f"An error occurred for {request['host_email']}: {result['error']}")
+
+
+if __name__ == "__main__":
+    main()
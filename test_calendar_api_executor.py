@@ -0,0 +1,221 @@
+import json
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+import httplib2
+from googleapiclient.errors import HttpError
+from calendar_api_executor import AdaptiveRateLimiter, execute_request, insert_event
+
+
+def make_http_error(status, reason=None):
+    content = json.dumps({"error": {"code": status, "errors": [{"reason": reason}]}}).encode("utf-8")
+    return HttpError(httplib2.Response({"status": status}), content)
+
+
+class FakeClock:
+    """A clock that only moves when something sleeps on it."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeRequest:
+    """Raises the given errors one per call, then returns the response."""
+
+    def __init__(self, errors=(), response=None):
+        self.errors = list(errors)
+        self.response = response if response is not None else {}
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.response
+
+
+class FakeEvents:
+    def __init__(self, insert_request):
+        self.insert_request = insert_request
+        self.inserted = None
+        self.fetched_id = None
+
+    def insert(self, calendarId, body, **kwargs):
+        self.inserted = body
+        return self.insert_request
+
+    def get(self, calendarId, eventId):
+        self.fetched_id = eventId
+        return FakeRequest(response={"id": eventId})
+
+
+class FakeService:
+    def __init__(self, insert_request):
+        self._events = FakeEvents(insert_request)
+
+    def events(self):
+        return self._events
+
+
+class ExecuteRequestTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = AdaptiveRateLimiter(initial_rate=8.0, clock=self.clock, sleep=self.clock.sleep)
+
+    def execute(self, request, **kwargs):
+        return execute_request(request, limiter=self.limiter, sleep=self.clock.sleep, **kwargs)
+
+    def test_retries_quota_errors_and_cuts_rate(self):
+        request = FakeRequest([make_http_error(429), make_http_error(403, "rateLimitExceeded")], {"items": []})
+
+        self.assertEqual(self.execute(request), {"items": []})
+        self.assertEqual(request.calls, 3)
+        # Two halvings from 8, then one additive increase for the success.
+        self.assertAlmostEqual(self.limiter.rate, 2.0 + 0.5 / 2.0)
+
+    def test_rate_grows_after_successes(self):
+        for _ in range(10):
+            self.execute(FakeRequest())
+        self.assertGreater(self.limiter.rate, 8.0)
+
+    def test_retries_network_errors(self):
+        request = FakeRequest([socket.timeout(), ConnectionResetError()])
+
+        self.execute(request)
+        self.assertEqual(request.calls, 3)
+        self.assertEqual(self.limiter.rate, 8.0 + 0.5 / 8.0)
+
+    def test_does_not_retry_other_errors(self):
+        request = FakeRequest([make_http_error(403, "forbidden")])
+
+        with self.assertRaises(HttpError):
+            self.execute(request)
+        self.assertEqual(request.calls, 1)
+
+    def test_does_not_retry_usage_limit(self):
+        request = FakeRequest([make_http_error(403, "quotaExceeded")])
+
+        with self.assertRaises(HttpError):
+            self.execute(request)
+        self.assertEqual(request.calls, 1)
+        self.assertEqual(self.limiter.rate, 8.0)
+
+    def test_gives_up_after_max_retries(self):
+        request = FakeRequest([make_http_error(429)] * 4)
+
+        with self.assertRaises(HttpError):
+            self.execute(request, max_retries=2)
+        self.assertEqual(request.calls, 3)
+        self.assertEqual(self.limiter.rate, 1.0)
+
+    def test_insert_fetches_event_when_retry_conflicts(self):
+        # The first attempt created the event but its response was lost.
+        service = FakeService(FakeRequest([socket.timeout(), make_http_error(409, "duplicate")]))
+
+        with mock.patch("calendar_api_executor.random.uniform", return_value=0):
+            event = insert_event(service, "primary", {"summary": "Sync"}, limiter=self.limiter)
+
+        events = service.events()
+        self.assertEqual(event, {"id": events.inserted["id"]})
+        self.assertEqual(events.fetched_id, events.inserted["id"])
+
+    def test_insert_raises_conflict_on_first_attempt(self):
+        service = FakeService(FakeRequest([make_http_error(409, "duplicate")]))
+
+        with self.assertRaises(HttpError):
+            insert_event(service, "primary", {"summary": "Sync"}, limiter=self.limiter)
+        self.assertIsNone(service.events().fetched_id)
+
+    def test_insert_raises_conflict_for_caller_supplied_id(self):
+        service = FakeService(FakeRequest([socket.timeout(), make_http_error(409, "duplicate")]))
+
+        with mock.patch("calendar_api_executor.random.uniform", return_value=0):
+            with self.assertRaises(HttpError):
+                insert_event(service, "primary", {"id": "existing1", "summary": "Sync"}, limiter=self.limiter)
+        self.assertIsNone(service.events().fetched_id)
+
+
+class FrozenClock:
+    """A clock that only moves when the test advances it; sleepers block until then."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleepers = 0
+        self._cond = threading.Condition()
+
+    def __call__(self):
+        with self._cond:
+            return self.now
+
+    def sleep(self, seconds):
+        with self._cond:
+            wake_at = self.now + seconds
+            self.sleepers += 1
+            while self.now < wake_at:
+                self._cond.wait()
+            self.sleepers -= 1
+
+    def advance(self, seconds):
+        with self._cond:
+            self.now += seconds
+            self._cond.notify_all()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.001)
+
+
+class AdaptiveRateLimiterTest(unittest.TestCase):
+    def test_waiting_calendars_take_turns_on_every_slot(self):
+        clock = FrozenClock()
+        limiter = AdaptiveRateLimiter(initial_rate=4.0, increase=0.0, clock=clock, sleep=clock.sleep)
+        sent = []
+
+        def send(calendar_id):
+            limiter.acquire(calendar_id)
+            sent.append((calendar_id, clock()))
+
+        # All of a's requests queue up before any of b's, while time stands still.
+        threads = []
+        for calendar_id in "aaaabbbb":
+            thread = threading.Thread(target=send, args=(calendar_id,), daemon=True)
+            thread.start()
+            threads.append(thread)
+            wait_until(lambda: len(sent) + clock.sleepers == len(threads))
+
+        for slot in range(1, 8):
+            clock.advance(0.25)
+            wait_until(lambda: len(sent) == slot + 1)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sent, [
+            ("a", 0.0), ("a", 0.25), ("b", 0.5), ("a", 0.75),
+            ("b", 1.0), ("a", 1.25), ("b", 1.5), ("b", 1.75),
+        ])
+
+    def test_idle_calendar_does_not_hold_back_others(self):
+        clock = FakeClock()
+        limiter = AdaptiveRateLimiter(initial_rate=4.0, increase=0.0, clock=clock, sleep=clock.sleep)
+
+        limiter.acquire("b")
+        for _ in range(8):
+            limiter.acquire("a")
+        # Nine requests, one every 0.25s: the last one goes out at 2.0.
+        self.assertEqual(clock.now, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
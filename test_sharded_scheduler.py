@@ -0,0 +1,141 @@
+import datetime as dt
+import os
+import tempfile
+import time
+import unittest
+import pytz
+from sharded_scheduler import (RECURRENCE_HORIZON, ShardedScheduler, find_conflicts,
+                               meeting_occurrences, normalize_time_zone, shard_for)
+
+
+# Handlers run in the worker processes, so they must be top-level functions.
+
+def finish_out_of_order(context, request):
+    # Later requests finish first.
+    time.sleep(0.05 * (3 - request["i"] % 4))
+    return request["i"]
+
+
+def report_pid(context, request):
+    return os.getpid()
+
+
+def slow_logged(context, request):
+    with open(request["log"], "a") as log:
+        log.write(f"{request['i']}\n")
+    time.sleep(0.2)
+    return request["i"]
+
+
+def die(context, request):
+    os._exit(1)
+
+
+def utc(*args):
+    return pytz.utc.localize(dt.datetime(*args))
+
+
+class ShardedSchedulerTest(unittest.TestCase):
+    def test_results_come_back_in_input_order(self):
+        requests = [{"host_email": f"host{i}@example.com", "i": i} for i in range(12)]
+
+        with ShardedScheduler(workers=4, handler=finish_out_of_order) as scheduler:
+            self.assertEqual(list(scheduler.map(requests)), list(range(12)))
+
+    def test_same_host_always_goes_to_same_worker(self):
+        self.assertEqual(shard_for("Host@Example.com ", 8), shard_for("host@example.com", 8))
+
+        hosts = ["a@example.com", "b@example.com", "c@example.com"]
+        requests = [{"host_email": hosts[i % 3]} for i in range(30)]
+        with ShardedScheduler(workers=3, handler=report_pid) as scheduler:
+            pids = list(scheduler.map(requests))
+
+        for host in hosts:
+            self.assertEqual(len({pid for request, pid in zip(requests, pids) if request["host_email"] == host}), 1)
+
+    def test_abandoned_map_skips_queued_requests_and_leaks_nothing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, "log")
+            first = [{"host_email": "host@example.com", "i": i, "log": log} for i in range(5)]
+            second = [{"host_email": "host@example.com", "i": 100, "log": log}]
+
+            with ShardedScheduler(workers=1, handler=slow_logged) as scheduler:
+                for result in scheduler.map(first):
+                    break
+                self.assertEqual(list(scheduler.map(second)), [100])
+
+            with open(log) as f:
+                ran = [int(line) for line in f]
+        # The first request, at most the one already running when we stopped, then the second map().
+        self.assertLessEqual(len(ran), 3)
+        self.assertEqual(ran[-1], 100)
+
+    def test_overlapping_map_is_refused(self):
+        requests = [{"host_email": "host@example.com", "i": i} for i in range(4)]
+
+        with ShardedScheduler(workers=1, handler=finish_out_of_order) as scheduler:
+            running = scheduler.map(requests)
+            next(running)
+            with self.assertRaises(RuntimeError):
+                list(scheduler.map(requests))
+            running.close()
+
+    def test_dead_worker_raises(self):
+        with ShardedScheduler(workers=2, handler=die, poll_interval=0.1) as scheduler:
+            with self.assertRaises(RuntimeError):
+                list(scheduler.map([{"host_email": "host@example.com"}]))
+
+
+class FindConflictsTest(unittest.TestCase):
+    occurrences = [(utc(2026, 10, 19, 5, 30), utc(2026, 10, 19, 6, 30)),
+                   (utc(2026, 10, 26, 5, 30), utc(2026, 10, 26, 6, 30))]
+
+    def test_touching_intervals_do_not_conflict(self):
+        busy = [{"start": "2026-10-19T04:30:00Z", "end": "2026-10-19T05:30:00Z"},
+                {"start": "2026-10-19T06:30:00Z", "end": "2026-10-19T07:00:00Z"}]
+        self.assertEqual(find_conflicts(self.occurrences, busy), [])
+
+    def test_overlap_with_any_occurrence_conflicts(self):
+        busy = [{"start": "2026-10-20T05:30:00Z", "end": "2026-10-20T06:30:00Z"},
+                {"start": "2026-10-26T06:29:00Z", "end": "2026-10-26T07:00:00Z"},
+                {"start": "2026-10-26T11:00:00+05:30", "end": "2026-10-26T11:15:00+05:30"}]
+        self.assertEqual(find_conflicts(self.occurrences, busy), busy[1:])
+
+
+class MeetingOccurrencesTest(unittest.TestCase):
+    def details(self, recurrence, time_zone="America/New_York"):
+        return {"time_zone": time_zone, "start_date": "2026-10-26", "start_time": "10:00",
+                "end_date": "2026-10-26", "end_time": "11:00", "recurrence": recurrence}
+
+    def test_keeps_wall_clock_time_across_dst(self):
+        # US daylight saving time ends on 2026-11-01.
+        occurrences = meeting_occurrences(self.details("RRULE:FREQ=WEEKLY;COUNT=2"))
+        self.assertEqual(occurrences, [(utc(2026, 10, 26, 14), utc(2026, 10, 26, 15)),
+                                       (utc(2026, 11, 2, 15), utc(2026, 11, 2, 16))])
+
+    def test_raises_past_horizon(self):
+        with self.assertRaises(ValueError):
+            meeting_occurrences(self.details("RRULE:FREQ=WEEKLY"))
+        with self.assertRaises(ValueError):
+            meeting_occurrences(self.details(f"RRULE:FREQ=DAILY;COUNT={RECURRENCE_HORIZON.days + 2}"))
+
+    def test_accepts_series_within_horizon(self):
+        occurrences = meeting_occurrences(self.details(f"RRULE:FREQ=DAILY;COUNT={RECURRENCE_HORIZON.days + 1}"))
+        self.assertEqual(len(occurrences), RECURRENCE_HORIZON.days + 1)
+
+
+class NormalizeTimeZoneTest(unittest.TestCase):
+    def test_ist_alias(self):
+        self.assertEqual(normalize_time_zone("IST"), "Asia/Kolkata")
+        self.assertEqual(normalize_time_zone(" ist "), "Asia/Kolkata")
+
+    def test_known_zone_is_kept(self):
+        self.assertEqual(normalize_time_zone("Europe/London"), "Europe/London")
+
+    def test_unknown_zone_raises(self):
+        with self.assertRaises(ValueError):
+            normalize_time_zone("Mars/Olympus_Mons")
+
+
+if __name__ == "__main__":
+    unittest.main()